@@ -733,6 +733,8 @@ def _evaluate_batch(
     scores = model.predict(hrt_batch=batch, target=target, slice_size=slice_size, mode=mode)
 
     if evaluator.filtered:
+        # filtering modifies the scores in-place, which is not possible for, e.g., expanded views
+        scores = scores.contiguous()
         column = TARGET_TO_INDEX[target]
         if all_pos_triples is None:
             raise ValueError(
@@ -604,6 +604,8 @@ class _OldAbstractModel(Model, ABC, autoreset=False):
     regularizer_default_kwargs: ClassVar[Optional[Mapping[str, Any]]] = None
     #: The instance of the regularizer
     regularizer: Regularizer  # type: ignore
+    #: Whether :meth:`reset_parameters_` is automatically called after ``__init__``, cf. :meth:`__init_subclass__`
+    _autoreset: ClassVar[bool] = False
 
     can_slice_h = False
     can_slice_r = False
@@ -636,11 +638,13 @@ class _OldAbstractModel(Model, ABC, autoreset=False):
         else:
             self.regularizer = NoRegularizer()
 
-        self._entity_ids = triples_factory.entity_ids
-        self._relation_ids = triples_factory.relation_ids
+        # convert the IDs once, rather than for every call of the score_{h,r,t} fallbacks
+        self._entity_ids = torch.as_tensor(list(triples_factory.entity_ids), dtype=torch.long)
+        self._relation_ids = torch.as_tensor(list(triples_factory.relation_ids), dtype=torch.long)
 
     def __init_subclass__(cls, autoreset: bool = True, **kwargs):  # noqa:D105
         super().__init_subclass__(**kwargs)
+        cls._autoreset = autoreset
         if autoreset:
             _add_post_reset_parameters(cls)
 
@@ -679,7 +683,7 @@ class _OldAbstractModel(Model, ABC, autoreset=False):
             "score_t function. This might cause the calculations to take longer than necessary.",
         )
         # Extend the hr_batch such that each (h, r) pair is combined with all possible tails
-        hrt_batch = extend_batch(batch=hr_batch, all_ids=list(self._entity_ids), dim=2)
+        hrt_batch = extend_batch(batch=hr_batch, all_ids=self._entity_ids, dim=2)
         # Calculate the scores for each (h, r, t) triple using the generic interaction function
         expanded_scores = self.score_hrt(hrt_batch=hrt_batch, mode=mode)
         # Reshape the scores to match the pre-defined output shape of the score_t function.
@@ -709,7 +713,7 @@ class _OldAbstractModel(Model, ABC, autoreset=False):
             "score_h function. This might cause the calculations to take longer than necessary.",
         )
         # Extend the rt_batch such that each (r, t) pair is combined with all possible heads
-        hrt_batch = extend_batch(batch=rt_batch, all_ids=list(self._entity_ids), dim=0)
+        hrt_batch = extend_batch(batch=rt_batch, all_ids=self._entity_ids, dim=0)
         # Calculate the scores for each (h, r, t) triple using the generic interaction function
         expanded_scores = self.score_hrt(hrt_batch=hrt_batch, mode=mode)
         # Reshape the scores to match the pre-defined output shape of the score_h function.
@@ -739,7 +743,7 @@ class _OldAbstractModel(Model, ABC, autoreset=False):
             "score_r function. This might cause the calculations to take longer than necessary.",
         )
         # Extend the ht_batch such that each (h, t) pair is combined with all possible relations
-        hrt_batch = extend_batch(batch=ht_batch, all_ids=list(self._relation_ids), dim=1)
+        hrt_batch = extend_batch(batch=ht_batch, all_ids=self._relation_ids, dim=1)
         # Calculate the scores for each (h, r, t) triple using the generic interaction function
         expanded_scores = self.score_hrt(hrt_batch=hrt_batch, mode=mode)
         # Reshape the scores to match the pre-defined output shape of the score_r function.
@@ -824,6 +828,15 @@ class EntityRelationEmbeddingModel(_OldAbstractModel, ABC, autoreset=False):
         self.relation_embeddings.post_parameter_update()
 
 
+@functools.lru_cache(maxsize=None)
+def _get_autoreset_class(cls: Type[Model]) -> Optional[Type[Model]]:
+    """Get the most specific class in the MRO which has a post-init reset hook."""
+    for base in cls.__mro__:
+        if base.__dict__.get("_autoreset"):
+            return base
+    return None
+
+
 def _add_post_reset_parameters(cls: Type[Model]) -> None:
     # The following lines add in a post-init hook to all subclasses
     # such that the reset_parameters_() function is run
@@ -832,7 +845,10 @@ def _add_post_reset_parameters(cls: Type[Model]) -> None:
     @functools.wraps(_original_init)
     def _new_init(self, *args, **kwargs):
         _original_init(self, *args, **kwargs)
-        self.reset_parameters_()
+        # Since the hook is added to all subclasses, the __init__ of a parent class may be wrapped, too. We only
+        # reset once, after the __init__ of the most specific class has finished.
+        if _get_autoreset_class(type(self)) is cls:
+            self.reset_parameters_()
 
     # sorry mypy, but this kind of evil must be permitted.
     cls.__init__ = _new_init  # type: ignore
@@ -8,15 +8,30 @@ import logging
 from abc import ABC
 from collections import defaultdict
 from operator import itemgetter
-from typing import Any, ClassVar, Generic, Iterable, List, Mapping, Optional, Sequence, Tuple, Type, Union, cast
+from typing import (
+    Any,
+    Callable,
+    ClassVar,
+    Dict,
+    Generic,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+    cast,
+)
 
 import torch
 from torch import nn
 
 from .base import Model
-from ..nn.emb import EmbeddingSpecification, RepresentationModule
+from ..nn.emb import Embedding, EmbeddingSpecification, RepresentationModule
 from ..nn.modules import Interaction, interaction_resolver
-from ..regularizers import Regularizer
+from ..regularizers import NoRegularizer, Regularizer
 from ..triples import CoreTriplesFactory
 from ..typing import HeadRepresentation, InductiveMode, RelationRepresentation, TailRepresentation
 from ..utils import check_shapes
@@ -62,27 +77,41 @@ class _NewAbstractModel(Model, ABC):
     can_slice_r = True
     can_slice_t = True
 
+    #: The cached sub-modules which are regularizers, cf. :meth:`collect_regularization_term`
+    _regularizers: Optional[Tuple[Regularizer, ...]] = None
+    #: The cached sub-modules which have a post-parameter update hook, cf. :meth:`post_parameter_update`
+    _post_parameter_update_modules: Optional[Tuple[nn.Module, ...]] = None
+
+    def __setattr__(self, name: str, value: Any) -> None:  # noqa: D105
+        if isinstance(value, nn.Module):
+            self._invalidate_module_cache()
+        super().__setattr__(name, value)
+
+    def add_module(self, name: str, module: Optional[nn.Module]) -> None:  # noqa: D102
+        self._invalidate_module_cache()
+        super().add_module(name, module)
+
+    def _invalidate_module_cache(self) -> None:
+        """Invalidate the cached sub-modules.
+
+        This happens automatically when a sub-module is assigned to the model itself, but has to be called manually
+        when registering a new sub-module deeper in the hierarchy, e.g., by appending to a :class:`torch.nn.ModuleList`.
+        """
+        self._regularizers = None
+        self._post_parameter_update_modules = None
+
     def _reset_parameters_(self):  # noqa: D401
         """Reset all parameters of the model in-place."""
         # cf. https://github.com/mberr/ea-sota-comparison/blob/6debd076f93a329753d819ff4d01567a23053720/src/kgm/utils/torch_utils.py#L317-L372   # noqa:E501
         # Make sure that all modules with parameters do have a reset_parameters method.
         uninitialized_parameters = set(map(id, self.parameters()))
-        parents = defaultdict(list)
 
-        # Recursively visit all sub-modules
-        task_list = []
-        for name, module in self.named_modules():
+        task_list = [
+            (name.count("."), module)
+            for name, module in self.named_modules()
             # skip self
-            if module is self:
-                continue
-
-            # Track parents for blaming
-            for p in module.parameters():
-                parents[id(p)].append(module)
-
-            # call reset_parameters if possible
-            if hasattr(module, "reset_parameters"):
-                task_list.append((name.count("."), module))
+            if module is not self and hasattr(module, "reset_parameters")
+        ]
 
         # initialize from bottom to top
         # This ensures that specialized initializations will take priority over the default ones of its components.
@@ -98,7 +127,13 @@ class _NewAbstractModel(Model, ABC):
                 len(uninitialized_parameters),
             )
 
-            # Additional debug information
+            # Additional debug information: track parents for blaming
+            parents = defaultdict(list)
+            for module in self.modules():
+                if module is self:
+                    continue
+                for p in module.parameters():
+                    parents[id(p)].append(module)
             for i, p_id in enumerate(uninitialized_parameters, start=1):
                 logger.debug("[%3d] Parents to blame: %s", i, parents.get(p_id))
 
@@ -119,18 +154,24 @@ class _NewAbstractModel(Model, ABC):
 
     def post_parameter_update(self) -> None:
         """Has to be called after each parameter update."""
-        for module in self.modules():
-            if module is self:
-                continue
-            if hasattr(module, "post_parameter_update"):
-                module.post_parameter_update()
+        if self._post_parameter_update_modules is None:
+            self._post_parameter_update_modules = tuple(
+                module for module in self.modules() if module is not self and hasattr(module, "post_parameter_update")
+            )
+        for module in self._post_parameter_update_modules:
+            module.post_parameter_update()
 
     def collect_regularization_term(self):  # noqa: D102
-        return sum(
-            regularizer.pop_regularization_term()
-            for regularizer in self.modules()
-            if isinstance(regularizer, Regularizer)
-        )
+        if self._regularizers is None:
+            # no-op regularizers never contribute to the term, so there is no need to visit them in every step
+            self._regularizers = tuple(
+                module
+                for module in self.modules()
+                if isinstance(module, Regularizer) and not isinstance(module, NoRegularizer)
+            )
+        if not self._regularizers:
+            return torch.zeros(tuple(), device=self.device)
+        return torch.stack([regularizer.pop_regularization_term() for regularizer in self._regularizers]).sum()
 
 
 def _prepare_representation_module_list(
@@ -190,7 +231,7 @@ def repeat_if_necessary(
     `score_{h,t}` / `score_r` are always the same. For efficiency, they are thus
     only computed once, but to meet the API, they have to be brought into the correct shape afterwards.
 
-    :param scores: shape: (batch_size, ?)
+    :param scores: shape: (batch_size, 1)
         the score tensor
     :param representations:
         the representations. If empty (i.e. no representations for this 1:n scoring), repetition needs to be applied
@@ -198,11 +239,28 @@ def repeat_if_necessary(
         the number of times to repeat, if necessary.
 
     :return:
-        the score tensor, which has been repeated, if necessary
+        the score tensor, which has been repeated, if necessary. The repetition is a (read-only) expanded view, which
+        does not allocate additional memory.
     """
     if representations:
         return scores
-    return scores.repeat(1, num)
+    return scores.expand(-1, num)
+
+
+def _lookup_heads_and_tails(
+    representation: RepresentationModule,
+    h: Optional[torch.LongTensor],
+    t: Optional[torch.LongTensor],
+) -> Tuple[torch.FloatTensor, torch.FloatTensor]:
+    """Look up the head and tail representations from a shared entity representation module."""
+    if h is None or t is None or representation.has_regularizer:
+        # the regularizer reduces each lookup separately, so a joint lookup would change its term
+        return representation.forward_unique(indices=h), representation.forward_unique(indices=t)
+    # head and tail share the entity representations, so we look them up jointly
+    x_h, x_t = representation.forward_unique(indices=torch.cat([h.reshape(-1), t.reshape(-1)], dim=0)).split(
+        [h.numel(), t.numel()], dim=0
+    )
+    return x_h.reshape(*h.shape, *representation.shape), x_t.reshape(*t.shape, *representation.shape)
 
 
 class ERModel(
@@ -238,6 +296,12 @@ class ERModel(
     #: The interaction function
     interaction: Interaction
 
+    #: The compiled version of :meth:`score_hrt`, cf. :meth:`compile_score_hrt`
+    _compiled_score_hrt: Optional[Callable[[torch.LongTensor], torch.FloatTensor]] = None
+
+    #: The traced versions of :meth:`score_hrt`, keyed by batch size, cf. :meth:`trace_score_hrt`
+    _traced_score_hrt: Optional[Dict[int, Callable[[torch.LongTensor], torch.FloatTensor]]] = None
+
     def __init__(
         self,
         *,
@@ -307,14 +371,18 @@ class ERModel(
         # normalize input
         if isinstance(parameter, (str, nn.Parameter)):
             parameter = [parameter]
-        weights: Mapping[str, nn.Parameter] = dict(self.named_parameters())
+        # only build the name lookup if names are given, and only once per call
+        weights: Optional[Mapping[str, nn.Parameter]] = None
         for param in parameter:
             if isinstance(param, str):
+                if weights is None:
+                    weights = dict(self.named_parameters())
                 if param not in weights:
                     raise KeyError(f"Invalid parameter_name={parameter}. Available are: {sorted(weights.keys())}.")
                 param: nn.Parameter = weights[param]  # type: ignore
             regularizer.add_parameter(parameter=param)
         self.weight_regularizers.append(regularizer)
+        self._invalidate_module_cache()
 
     def forward(
         self,
@@ -370,13 +438,148 @@ class ERModel(
         :return: shape: (batch_size, 1), dtype: float
             The score for each triple.
         """
+        if mode is None and not torch.jit.is_tracing():
+            if self._traced_score_hrt is not None and not self.training:
+                return self._get_traced_score_hrt(hrt_batch=hrt_batch)(hrt_batch)
+            if self._compiled_score_hrt is not None:
+                return self._compiled_score_hrt(hrt_batch)
+        return self._score_hrt(hrt_batch=hrt_batch, mode=mode)
+
+    def _get_traced_score_hrt(self, hrt_batch: torch.LongTensor) -> Callable[[torch.LongTensor], torch.FloatTensor]:
+        """Get the traced triple scoring function for the given batch's size, tracing it upon first request."""
+        assert self._traced_score_hrt is not None
+        batch_size = hrt_batch.shape[0]
+        traced = self._traced_score_hrt.get(batch_size)
+        if traced is None:
+            # note: tracing a method of the module keeps the parameters as parameters rather than constants
+            traced_module = torch.jit.trace_module(self, {"_score_hrt": (hrt_batch,)}, check_trace=False)
+            traced = self._traced_score_hrt[batch_size] = traced_module._score_hrt
+        return traced
+
+    def _score_hrt(self, hrt_batch: torch.LongTensor, mode: Optional[InductiveMode] = None) -> torch.FloatTensor:
+        """Score triples without dispatching to the compiled version; cf. :meth:`score_hrt`."""
         # Note: slicing cannot be used here: the indices for score_hrt only have a batch
         # dimension, and slicing along this dimension is already considered by sub-batching.
         # Note: we do not delegate to the general method for performance reasons
         # Note: repetition is not necessary here
-        h, r, t = self._get_representations(h=hrt_batch[:, 0], r=hrt_batch[:, 1], t=hrt_batch[:, 2], mode=mode)
+        h_indices, r_indices, t_indices = hrt_batch.unbind(dim=1)
+        h, r, t = self._get_representations(h=h_indices, r=r_indices, t=t_indices, mode=mode)
         return self.interaction.score_hrt(h=h, r=r, t=t)
 
+    def compile_score_hrt(self, compile_mode: Optional[str] = None, dynamic: Optional[bool] = True) -> None:
+        """Compile the (transductive) triple scoring via :func:`torch.compile`.
+
+        Afterwards, :meth:`score_hrt` dispatches to the compiled function whenever it is called with ``mode=None``.
+        This allows fusing the representation lookup and the interaction function into fewer kernels.
+
+        .. note ::
+
+            The compiled function is not part of the model's state, i.e., it is dropped when the model is pickled,
+            and has to be re-created after loading.
+
+        :param compile_mode:
+            The compilation mode, cf. :func:`torch.compile`, e.g., ``"reduce-overhead"``. Not to be confused with the
+            inductive ``mode`` of :meth:`score_hrt`.
+        :param dynamic:
+            Whether to compile for dynamic shapes. Since the batch size varies, e.g., for the last batch of an
+            epoch, this defaults to True to avoid re-compilation.
+
+        :raises NotImplementedError:
+            if the installed PyTorch version does not provide :func:`torch.compile`
+        """
+        if not hasattr(torch, "compile"):
+            raise NotImplementedError(f"torch.compile requires PyTorch 2.0+, but found torch=={torch.__version__}")
+        self._compiled_score_hrt = torch.compile(self._score_hrt, mode=compile_mode, dynamic=dynamic)
+
+    def trace_score_hrt(self, enable: bool = True) -> None:
+        """Enable tracing of the (transductive) triple scoring via :func:`torch.jit.trace`.
+
+        This is intended for serving scenarios, where :meth:`score_hrt` is repeatedly called in evaluation mode with
+        a few fixed batch sizes. Upon the first call with a new batch size, the scoring is traced, and subsequent calls
+        with the same batch size use the traced function, which avoids the Python overhead of dispatching through
+        the representation modules and the interaction function. In training mode, or if ``mode`` is given,
+        :meth:`score_hrt` falls back to the regular implementation.
+
+        .. warning ::
+
+            The trace records the operations for the model's current configuration, i.e., side effects such as
+            updating the regularization term are not replayed. Thus, it should only be used for inference.
+            Since cached tensors are recorded as constants, all traced functions are dropped when switching to
+            training mode, loading a state dict, or converting the model, e.g., via :meth:`torch.nn.Module.to` or
+            :meth:`to_inference_dtype`.
+
+        :param enable:
+            Whether to enable tracing. Disabling it also drops all previously traced functions.
+        """
+        self._traced_score_hrt = {} if enable else None
+
+    def _invalidate_traced_score_hrt(self) -> None:
+        """Drop all traced functions, since they may have captured stale tensors as constants."""
+        if self._traced_score_hrt is not None:
+            self._traced_score_hrt = {}
+
+    def train(self, mode: bool = True):  # noqa: D102
+        # cached tensors, e.g., CompGCN's enriched representations, are baked into the trace, and become stale once
+        # the parameters are updated
+        if mode:
+            self._invalidate_traced_score_hrt()
+        return super().train(mode=mode)
+
+    def _apply(self, *args, **kwargs):  # noqa: D102
+        # called by .to(), .cuda(), etc.
+        self._invalidate_traced_score_hrt()
+        return super()._apply(*args, **kwargs)
+
+    def _load_from_state_dict(self, *args, **kwargs):  # noqa: D102
+        self._invalidate_traced_score_hrt()
+        return super()._load_from_state_dict(*args, **kwargs)
+
+    def to_inference_dtype(self, dtype: torch.dtype = torch.bfloat16) -> "ERModel":
+        """Convert the model to a reduced-precision floating point data type for inference.
+
+        Scoring against all entities, e.g., during evaluation, is usually bound by the memory bandwidth required to
+        read the entity representations. Storing them in a 16-bit floating point format such as bfloat16 halves this
+        cost; on GPUs with native support (e.g., Ampere or newer), computations also become faster.
+
+        .. warning ::
+
+            The conversion is lossy and happens in-place, i.e., no full-precision copy of the parameters is kept.
+            If training should be continued afterwards, store the model's state before, e.g., via
+            :meth:`save_state`. Moreover, the reduced precision leads to more ties in scores, which can affect
+            rank-based evaluation.
+
+        :param dtype:
+            The floating point data type.
+
+        :return:
+            The model itself, which has been converted and set to evaluation mode.
+
+        :raises ValueError:
+            if the data type is not a floating point data type, or if the model has complex-valued representations
+            and the data type is neither single nor double precision, since PyTorch does not provide complex data
+            types for those.
+        """
+        if not dtype.is_floating_point:
+            raise ValueError(f"Can only convert to floating point data types, but dtype={dtype} was given.")
+        if dtype not in {torch.float32, torch.float64} and any(
+            isinstance(module, Embedding) and module.is_complex for module in self.modules()
+        ):
+            raise ValueError(
+                f"{self.__class__.__name__} has complex-valued representations, which only support single or double "
+                f"precision, but dtype={dtype} was given.",
+            )
+        self.eval()
+        # note: the interaction's parameters have to be converted, too, since they interact with the representations
+        return self.to(dtype=dtype)
+
+    def __getstate__(self):  # noqa: D105
+        # compiled and traced functions cannot be pickled
+        state = self.__dict__.copy()
+        state.pop("_compiled_score_hrt", None)
+        if state.get("_traced_score_hrt") is not None:
+            state["_traced_score_hrt"] = {}
+        return state
+
     def score_t(
         self, hr_batch: torch.LongTensor, *, slice_size: Optional[int] = None, mode: Optional[InductiveMode] = None
     ) -> torch.FloatTensor:
@@ -395,7 +598,8 @@ class ERModel(
         :return: shape: (batch_size, num_entities), dtype: float
             For each h-r pair, the scores for all possible tails.
         """
-        h, r, t = self._get_representations(h=hr_batch[:, 0], r=hr_batch[:, 1], t=None, mode=mode)
+        h_indices, r_indices = hr_batch.unbind(dim=1)
+        h, r, t = self._get_representations(h=h_indices, r=r_indices, t=None, mode=mode)
         return repeat_if_necessary(
             scores=self.interaction.score_t(h=h, r=r, all_entities=t, slice_size=slice_size),
             representations=self.entity_representations,
@@ -420,7 +624,8 @@ class ERModel(
         :return: shape: (batch_size, num_entities), dtype: float
             For each r-t pair, the scores for all possible heads.
         """
-        h, r, t = self._get_representations(h=None, r=rt_batch[:, 0], t=rt_batch[:, 1], mode=mode)
+        r_indices, t_indices = rt_batch.unbind(dim=1)
+        h, r, t = self._get_representations(h=None, r=r_indices, t=t_indices, mode=mode)
         return repeat_if_necessary(
             scores=self.interaction.score_h(all_entities=h, r=r, t=t, slice_size=slice_size),
             representations=self.entity_representations,
@@ -445,7 +650,8 @@ class ERModel(
         :return: shape: (batch_size, num_relations), dtype: float
             For each h-t pair, the scores for all possible relations.
         """
-        h, r, t = self._get_representations(h=ht_batch[:, 0], r=None, t=ht_batch[:, 1], mode=mode)
+        h_indices, t_indices = ht_batch.unbind(dim=1)
+        h, r, t = self._get_representations(h=h_indices, r=None, t=t_indices, mode=mode)
         return repeat_if_necessary(
             scores=self.interaction.score_r(h=h, all_relations=r, t=t, slice_size=slice_size),
             representations=self.relation_representations,
@@ -461,14 +667,20 @@ class ERModel(
         mode: Optional[InductiveMode],
     ) -> Tuple[HeadRepresentation, RelationRepresentation, TailRepresentation]:
         """Get representations for head, relation and tails."""
-        hr, rr, tr = [
-            [representation.forward_unique(indices=indices) for representation in representations]
-            for indices, representations in (
-                (h, self.entity_representations),
-                (r, self.relation_representations),
-                (t, self.entity_representations),
+        if len(self.entity_representations) == 1 and len(self.relation_representations) == 1:
+            # fast path for the most common case of a single entity and relation representation, which skips
+            # building and normalizing the lists of representations
+            x_h, x_t = _lookup_heads_and_tails(representation=self.entity_representations[0], h=h, t=t)
+            return cast(
+                Tuple[HeadRepresentation, RelationRepresentation, TailRepresentation],
+                (x_h, self.relation_representations[0].forward_unique(indices=r), x_t),
             )
-        ]
+        hr, tr = [], []
+        for representation in self.entity_representations:
+            x_h, x_t = _lookup_heads_and_tails(representation=representation, h=h, t=t)
+            hr.append(x_h)
+            tr.append(x_t)
+        rr = [representation.forward_unique(indices=r) for representation in self.relation_representations]
         # normalization
         return cast(
             Tuple[HeadRepresentation, RelationRepresentation, TailRepresentation],
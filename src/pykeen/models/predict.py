@@ -383,7 +383,8 @@ class _TopKScoreConsumer(_ScoreConsumer):
         batch_size, num_entities = scores.shape
 
         # reshape, shape: (batch_size * num_entities,)
-        top_scores = scores.view(-1)
+        # note: the scores may be an expanded view, cf. repeat_if_necessary, which cannot be flattened without a copy
+        top_scores = scores.reshape(-1)
 
         # get top scores within batch
         if top_scores.numel() >= self.k:
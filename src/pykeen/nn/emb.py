@@ -4,12 +4,13 @@
 
 from __future__ import annotations
 
+import contextlib
 import itertools
 import logging
 import warnings
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import Any, Mapping, Optional, Sequence, Tuple, Union
+from typing import Any, ClassVar, Mapping, Optional, Sequence, Tuple, Union
 
 import numpy as np
 import torch
@@ -23,7 +24,7 @@ from .compositions import CompositionModule, composition_resolver
 from .init import initializer_resolver, uniform_norm_p1_
 from .utils import TransformerEncoder
 from .weighting import EdgeWeighting, SymmetricEdgeWeighting, edge_weight_resolver
-from ..regularizers import Regularizer, regularizer_resolver
+from ..regularizers import NoRegularizer, Regularizer, regularizer_resolver
 from ..triples import CoreTriplesFactory, TriplesFactory
 from ..typing import Constrainer, Hint, HintType, Initializer, Normalizer
 from ..utils import Bias, clamp_norm, complex_normalize
@@ -73,6 +74,17 @@ class RepresentationModule(nn.Module, ABC):
     #: the shape of an individual representation
     shape: Tuple[int, ...]
 
+    #: the maximum number of indices for which :meth:`forward_unique` directly calls :meth:`forward` without
+    #: de-duplication, since for small batches the cost of `unique` exceeds the savings. Representations with an
+    #: expensive forward pass per index, e.g., :class:`LabelBasedTransformerRepresentation`, set it to zero.
+    #: Representations with a regularizer are always de-duplicated, such that the regularization term does not
+    #: depend on the batch size.
+    unique_threshold: ClassVar[int] = 1024
+
+    #: whether the module regularizes the looked-up representations, which requires de-duplicated and separate
+    #: lookups for heads and tails. Determined once at construction by representations with a regularizer.
+    has_regularizer: bool = False
+
     def __init__(
         self,
         max_id: int,
@@ -115,6 +127,11 @@ class RepresentationModule(nn.Module, ABC):
     ) -> torch.FloatTensor:
         """Get representations for indices.
 
+        .. note ::
+
+            de-duplication is only applied if there are more than :attr:`unique_threshold` indices, or if the
+            representation has a regularizer (cf. :attr:`has_regularizer`).
+
         :param indices: shape: s
             The indices, or None. If None, this is interpreted as ``torch.arange(self.max_id)`` (although implemented
             more efficiently).
@@ -122,8 +139,8 @@ class RepresentationModule(nn.Module, ABC):
         :return: shape: (``*s``, ``*self.shape``)
             The representations.
         """
-        if indices is None:
-            return self(None)
+        if indices is None or (indices.numel() <= self.unique_threshold and not self.has_regularizer):
+            return self(indices)
         unique, inverse = indices.unique(return_inverse=True)
         return self(unique)[inverse]
 
@@ -208,6 +225,8 @@ class Embedding(RepresentationModule):
     constrainer: Optional[Constrainer]
     regularizer: Optional[Regularizer]
     dropout: Optional[nn.Dropout]
+    #: whether the embeddings are complex-valued, and stored as real-valued tensors with real and imaginary parts
+    is_complex: bool
 
     def __init__(
         self,
@@ -225,6 +244,7 @@ class Embedding(RepresentationModule):
         trainable: bool = True,
         dtype: Optional[torch.dtype] = None,
         dropout: Optional[float] = None,
+        device: Optional[torch.device] = None,
     ):
         """Instantiate an embedding with extended functionality.
 
@@ -271,6 +291,9 @@ class Embedding(RepresentationModule):
             Additional keyword arguments passed to the regularizer
         :param dropout:
             A dropout value for the embeddings.
+        :param device:
+            The device on which to allocate the embedding weights. Allocating them directly on the target device
+            avoids initializing them on CPU and copying them afterwards.
         """
         # normalize embedding_dim vs. shape
         _embedding_dim, shape = process_shape(embedding_dim, shape)
@@ -280,7 +303,8 @@ class Embedding(RepresentationModule):
 
         # work-around until full complex support (torch==1.10 still does not work)
         # TODO: verify that this is our understanding of complex!
-        if dtype.is_complex:
+        is_complex = dtype.is_complex
+        if is_complex:
             shape = tuple(shape[:-1]) + (2 * shape[-1],)
             _embedding_dim = _embedding_dim * 2
             # note: this seems to work, as finfo returns the datatype of the underlying floating
@@ -291,6 +315,7 @@ class Embedding(RepresentationModule):
             max_id=num_embeddings,
             shape=shape,
         )
+        self.is_complex = is_complex
 
         # use make for initializer since there's a default, and make_safe
         # for the others to pass through None values
@@ -298,11 +323,13 @@ class Embedding(RepresentationModule):
         self.normalizer = normalizer_resolver.make_safe(normalizer, normalizer_kwargs)
         self.constrainer = constrainer_resolver.make_safe(constrainer, constrainer_kwargs)
         self.regularizer = regularizer_resolver.make_safe(regularizer, regularizer_kwargs)
+        self.has_regularizer = self.regularizer is not None and not isinstance(self.regularizer, NoRegularizer)
 
         self._embeddings = torch.nn.Embedding(
             num_embeddings=num_embeddings,
             embedding_dim=_embedding_dim,
             dtype=dtype,
+            device=device,
         )
         self._embeddings.requires_grad_(trainable)
         self.dropout = None if dropout is None else nn.Dropout(dropout)
@@ -486,8 +513,10 @@ class EmbeddingSpecification:
             regularizer_kwargs=self.regularizer_kwargs,
             dtype=self.dtype,
             dropout=self.dropout,
+            device=device,
         )
         if device is not None:
+            # move remaining buffers, e.g., of the regularizer
             rv = rv.to(device)
         return rv
 
@@ -570,7 +599,7 @@ class CompGCNLayer(nn.Module):
 
         # edge weighting
         self.edge_weighting: EdgeWeighting = edge_weight_resolver.make(
-            edge_weighting, output_dim=output_dim, attn_drop=attention_dropout, num_heads=attention_heads
+            edge_weighting, message_dim=output_dim, dropout=attention_dropout, num_heads=attention_heads
         )
 
         # message passing weights
@@ -642,8 +671,13 @@ class CompGCNLayer(nn.Module):
         # normalization
         m = self.edge_weighting(source=source, target=target, message=m, x_e=x_e)
 
-        # aggregate by sum
-        x_e = x_e.new_zeros(x_e.shape[0], m.shape[1]).index_add(dim=0, index=target, source=m)
+        # aggregate by sum; note: the in-place variant avoids copying the freshly allocated zeros
+        # note: under autocast, the messages may be in reduced precision; we accumulate them in (at least) single
+        #       precision, since summing many messages, e.g., for high-degree nodes, in half precision loses accuracy
+        dtype = torch.promote_types(x_e.dtype, torch.float32)
+        x_e = x_e.new_zeros(x_e.shape[0], m.shape[1], dtype=dtype).index_add_(
+            dim=0, index=target, source=m.to(dtype=dtype)
+        )
 
         # dropout
         x_e = self.drop(x_e)
@@ -712,6 +746,7 @@ class CombinedCompGCNRepresentations(nn.Module):
         num_layers: Optional[int] = 1,
         dims: Union[None, int, Sequence[int]] = None,
         layer_kwargs: Optional[Mapping[str, Any]] = None,
+        autocast_dtype: Optional[torch.dtype] = None,
     ):
         """
         Initialize the combined entity and relation representation module.
@@ -728,6 +763,10 @@ class CombinedCompGCNRepresentations(nn.Module):
             If an integer, is the same for all layers. The last dimension is equal to the output dimension.
         :param layer_kwargs:
             Additional key-word based parameters passed to the individual layers; cf. CompGCNLayer.
+        :param autocast_dtype:
+            If given, run the message passing layers under automatic mixed precision with this data type, e.g.,
+            ``torch.bfloat16``, which speeds up the dense transformations on recent GPUs. The enriched
+            representations are cast back to the data type of the base representations.
         """
         super().__init__()
         # TODO: Check
@@ -754,6 +793,7 @@ class CombinedCompGCNRepresentations(nn.Module):
                 f"The number of provided dimensions ({len(dims)}) must equal the number of layers ({num_layers}).",
             )
         self.output_dim = dims[-1]
+        self.autocast_dtype = autocast_dtype
 
         # Create message passing layers
         layers = []
@@ -769,8 +809,14 @@ class CombinedCompGCNRepresentations(nn.Module):
 
         # register buffers for adjacency matrix; we use the same format as PyTorch Geometric
         # TODO: This always uses all training triples for message passing
-        self.register_buffer(name="edge_index", tensor=triples_factory.mapped_triples[:, [0, 2]].t())
-        self.register_buffer(name="edge_type", tensor=triples_factory.mapped_triples[:, 1])
+        mapped_triples = triples_factory.mapped_triples
+        # the graph is static, hence we sort the edges by (target, source) once. Thereby, the aggregation of
+        # messages in the forward direction writes to consecutive memory locations, instead of random ones.
+        perm = (mapped_triples[:, 2] * triples_factory.num_entities + mapped_triples[:, 0]).argsort()
+        mapped_triples = mapped_triples[perm]
+        # note: we store a contiguous copy, since the transposed view would require a copy in every gather / scatter
+        self.register_buffer(name="edge_index", tensor=mapped_triples[:, [0, 2]].t().contiguous())
+        self.register_buffer(name="edge_type", tensor=mapped_triples[:, 1])
 
         # initialize buffer of enriched representations
         self.enriched_representations = None
@@ -787,17 +833,38 @@ class CombinedCompGCNRepresentations(nn.Module):
             self.enriched_representations = None
         return super().train(mode=mode)
 
+    def _load_from_state_dict(self, *args, **kwargs):  # noqa: D102
+        # loading a state changes the parameters of the base representations and layers without a call to
+        # post_parameter_update, hence we need to invalidate the buffered representations here, too.
+        self.enriched_representations = None
+        return super()._load_from_state_dict(*args, **kwargs)
+
     def forward(
         self,
     ) -> Tuple[torch.FloatTensor, torch.FloatTensor]:
         """Compute enriched representations."""
-        if self.enriched_representations is None:
+        if self.enriched_representations is None or (
+            # representations computed in inference mode cannot be used in computations recorded by autograd
+            torch.is_grad_enabled()
+            and self.enriched_representations[0].is_inference()
+        ):
             x_e = self.entity_representations()
             x_r = self.relation_representations()
+            # buffers are resolved via nn.Module.__getattr__; look them up only once rather than once per layer
+            edge_index, edge_type = self.edge_index, self.edge_type
+            dtype = x_e.dtype
             # enrich
-            for layer in self.layers:
-                x_e, x_r = layer(x_e=x_e, x_r=x_r, edge_index=self.edge_index, edge_type=self.edge_type)
-            self.enriched_representations = (x_e, x_r)
+            # note: we do not enter a disabled autocast context, since this would disable an outer one
+            # note: if gradients are not required anyway, e.g., during evaluation, we use the inference mode, which
+            #       further reduces the overhead of the many small operations in message passing
+            with (
+                contextlib.nullcontext()
+                if self.autocast_dtype is None
+                else torch.autocast(device_type=x_e.device.type, dtype=self.autocast_dtype)
+            ), torch.inference_mode(mode=not self.training and not torch.is_grad_enabled()):
+                for layer in self.layers:
+                    x_e, x_r = layer(x_e=x_e, x_r=x_r, edge_index=edge_index, edge_type=edge_type)
+            self.enriched_representations = (x_e.to(dtype=dtype), x_r.to(dtype=dtype))
         return self.enriched_representations
 
     def split(self) -> Tuple["SingleCompGCNRepresentation", "SingleCompGCNRepresentation"]:
@@ -843,7 +910,9 @@ class SingleCompGCNRepresentation(RepresentationModule):
     ) -> torch.FloatTensor:  # noqa: D102
         x = self.combined()[self.position]
         if indices is not None:
-            x = x[indices]
+            # note: this uses the same (index_select-based) kernels as an embedding lookup, which are faster than
+            # advanced indexing, in particular for the backward pass
+            x = functional.embedding(indices, x)
         return x
 
 
@@ -873,6 +942,9 @@ class LabelBasedTransformerRepresentation(RepresentationModule):
         )
     """
 
+    #: the transformer encodes each index separately, so that de-duplication pays off even for small batches
+    unique_threshold: ClassVar[int] = 0
+
     def __init__(
         self,
         labels: Sequence[str],
@@ -104,7 +104,7 @@ def parallel_slice_batches(
     length = list(map(len, rs))
     splits = numpy.cumsum([0] + length)
     # flatten list
-    rsl: Sequence[torch.FloatTensor] = sum(map(list, rs), [])
+    rsl: Sequence[torch.FloatTensor] = list(itt.chain.from_iterable(rs))
     # split tensors
     parts = [r.split(split_size, dim=dim) for r in rsl]
     # broadcasting
@@ -703,6 +703,37 @@ class DistMultInteraction(FunctionalInteraction[FloatTensor, FloatTensor, FloatT
 
     func = pkf.distmult_interaction
 
+    # Note: since DistMult is multi-linear, scoring against all entities / relations can be written as a single
+    # matrix multiplication, which does neither materialize the broadcasted (batch_size, num, dim) tensor, nor
+    # require slicing.
+
+    def score_h(
+        self,
+        all_entities: FloatTensor,
+        r: FloatTensor,
+        t: FloatTensor,
+        slice_size: Optional[int] = None,
+    ) -> FloatTensor:  # noqa: D102
+        return (r * t) @ all_entities.t()
+
+    def score_r(
+        self,
+        h: FloatTensor,
+        all_relations: FloatTensor,
+        t: FloatTensor,
+        slice_size: Optional[int] = None,
+    ) -> FloatTensor:  # noqa: D102
+        return (h * t) @ all_relations.t()
+
+    def score_t(
+        self,
+        h: FloatTensor,
+        r: FloatTensor,
+        all_entities: FloatTensor,
+        slice_size: Optional[int] = None,
+    ) -> FloatTensor:  # noqa: D102
+        return (h * r) @ all_entities.t()
+
 
 class DistMAInteraction(FunctionalInteraction[FloatTensor, FloatTensor, FloatTensor]):
     """A module wrapper for the stateless DistMA interaction function.
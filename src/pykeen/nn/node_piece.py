@@ -3,7 +3,7 @@
 import logging
 from abc import abstractmethod
 from collections import defaultdict
-from typing import Callable, Iterable, Optional, Sequence, Tuple, Union
+from typing import Callable, ClassVar, Iterable, Optional, Sequence, Tuple, Union
 
 import numpy
 import numpy.linalg
@@ -705,6 +705,9 @@ class NodePieceRepresentation(RepresentationModule):
     #: the token representations
     tokenizations: Sequence[TokenizationRepresentationModule]
 
+    #: the token aggregation runs once per index, so that de-duplication pays off even for small batches
+    unique_threshold: ClassVar[int] = 0
+
     def __init__(
         self,
         *,
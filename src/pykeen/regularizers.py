@@ -92,7 +92,10 @@ class Regularizer(nn.Module, ABC):
         """Update the regularization term based on passed tensors."""
         if not self.training or not torch.is_grad_enabled() or (self.apply_only_once and self.updated):
             return
-        self.regularization_term = self.regularization_term + sum(self.forward(x=x) for x in tensors)
+        if tensors:
+            # reduce all per-tensor terms at once rather than by a chain of binary additions
+            terms = torch.stack([self.forward(x=x) for x in tensors])
+            self.regularization_term = self.regularization_term + terms.sum()
         self.updated = True
 
     @property
@@ -55,19 +55,20 @@ class BasicNegativeSampler(NegativeSampler):
         self._corruption_indices = [TARGET_TO_INDEX[side] for side in self.corruption_scheme]
 
     def corrupt_batch(self, positive_batch: torch.LongTensor) -> torch.LongTensor:  # noqa: D102
+        # Copy positive batch for corruption.
+        # Do not detach, as no gradients should flow into the indices.
+        # note: repeat_interleave already creates a copy, hence there is no need for another one
         if self.num_negs_per_pos > 1:
-            positive_batch = positive_batch.repeat_interleave(repeats=self.num_negs_per_pos, dim=0)
+            negative_batch = positive_batch.repeat_interleave(repeats=self.num_negs_per_pos, dim=0)
+        else:
+            negative_batch = positive_batch.clone()
 
         # Bind number of negatives to sample
-        num_negs = positive_batch.shape[0]
+        num_negs = negative_batch.shape[0]
 
         # Equally corrupt all sides
         split_idx = int(math.ceil(num_negs / len(self._corruption_indices)))
 
-        # Copy positive batch for corruption.
-        # Do not detach, as no gradients should flow into the indices.
-        negative_batch = positive_batch.clone()
-
         for index, start in zip(self._corruption_indices, range(0, num_negs, split_idx)):
             stop = min(start + split_idx, num_negs)
 
@@ -75,17 +76,17 @@ class BasicNegativeSampler(NegativeSampler):
             # At least make sure to not replace the triples by the original value
             index_max = (self.num_relations if index == 1 else self.num_entities) - 1
 
-            negative_batch[start:stop, index] = torch.randint(
+            negative_indices = torch.randint(
                 high=index_max,
                 size=(stop - start,),
-                device=positive_batch.device,
+                device=negative_batch.device,
             )
 
             # To make sure we don't replace the {head, relation, tail} by the
             # original value we shift all values greater or equal than the original value by one up
             # for that reason we choose the random value from [0, num_{heads, relations, tails} -1]
-            negative_batch[start:stop, index] += (
-                negative_batch[start:stop, index] >= positive_batch[start:stop, index]
-            ).long()
+            # note: the slices are disjoint, i.e., the original value has not been overwritten yet
+            negative_indices += (negative_indices >= negative_batch[start:stop, index]).long()
+            negative_batch[start:stop, index] = negative_indices
 
         return negative_batch.view(-1, self.num_negs_per_pos, 3)
@@ -71,23 +71,24 @@ class BernoulliNegativeSampler(NegativeSampler):
             self.corrupt_head_probability[r] = tph / (tph + hpt)
 
     def corrupt_batch(self, positive_batch: torch.LongTensor) -> torch.LongTensor:  # noqa: D102
+        # Copy positive batch for corruption.
+        # Do not detach, as no gradients should flow into the indices.
+        # note: repeat_interleave already creates a copy, hence there is no need for another one
         if self.num_negs_per_pos > 1:
-            positive_batch = positive_batch.repeat_interleave(repeats=self.num_negs_per_pos, dim=0)
+            negative_batch = positive_batch.repeat_interleave(repeats=self.num_negs_per_pos, dim=0)
+        else:
+            negative_batch = positive_batch.clone()
 
         # Bind number of negatives to sample
-        num_negs = positive_batch.shape[0]
-
-        # Copy positive batch for corruption.
-        # Do not detach, as no gradients should flow into the indices.
-        negative_batch = positive_batch.clone()
+        num_negs = negative_batch.shape[0]
 
-        device = positive_batch.device
+        device = negative_batch.device
         # Decide whether to corrupt head or tail
-        head_corruption_probability = self.corrupt_head_probability[positive_batch[:, 1]]
+        head_corruption_probability = self.corrupt_head_probability[negative_batch[:, 1]]
         head_mask = torch.rand(num_negs, device=device) < head_corruption_probability.to(device=device)
 
-        # Tails are corrupted if heads are not corrupted
-        tail_mask = ~head_mask
+        # Tails are corrupted if heads are not corrupted, i.e., the column to corrupt is 0 for heads and 2 for tails
+        column = (2 - 2 * head_mask.long()).unsqueeze(dim=-1)
 
         # We at least make sure to not replace the triples by the original value
         # See below for explanation of why this is on a range of [0, num_entities - 1]
@@ -96,20 +97,16 @@ class BernoulliNegativeSampler(NegativeSampler):
         # Randomly sample corruption.
         negative_entities = torch.randint(
             index_max,
-            size=(num_negs,),
-            device=positive_batch.device,
+            size=(num_negs, 1),
+            device=device,
         )
 
-        # Replace heads
-        negative_batch[head_mask, 0] = negative_entities[head_mask]
-
-        # Replace tails
-        negative_batch[tail_mask, 2] = negative_entities[tail_mask]
-
-        # To make sure we don't replace the head by the original value
+        # To make sure we don't replace the head / tail by the original value
         # we shift all values greater or equal than the original value by one up
         # for that reason we choose the random value from [0, num_entities -1]
-        negative_batch[head_mask, 0] += (negative_batch[head_mask, 0] >= positive_batch[head_mask, 0]).long()
-        negative_batch[tail_mask, 2] += (negative_batch[tail_mask, 2] >= positive_batch[tail_mask, 2]).long()
+        negative_entities += (negative_entities >= negative_batch.gather(dim=1, index=column)).long()
+
+        # Replace heads / tails
+        negative_batch.scatter_(dim=1, index=column, src=negative_entities)
 
         return negative_batch.view(-1, self.num_negs_per_pos, 3)
@@ -72,24 +72,28 @@ class SLCWATrainingLoop(TrainingLoop[SLCWASampleType, SLCWABatchType]):
         if slice_size is not None:
             raise AttributeError("Slicing is not possible for sLCWA training loops.")
 
-        # Send positive batch to device
-        positive_batch = batch[start:stop].to(device=self.device)
+        # Send positive batch to device. The data loader uses pinned memory by default, hence the transfer can be
+        # asynchronous; subsequent operations on the device's stream are ordered after the copy.
+        positive_batch = batch[start:stop].to(device=self.device, non_blocking=True)
 
         # Create negative samples, shape: (batch_size, num_neg_per_pos, 3)
         negative_batch, positive_filter = self.negative_sampler.sample(positive_batch=positive_batch)
 
+        # Ensure they reside on the device (should hold already for most simple negative samplers, e.g.
+        # BasicNegativeSampler, BernoulliNegativeSampler). We do so before applying the filter mask, such that
+        # the masking does not create intermediate copies on the CPU. If they already reside on the device, this is a
+        # no-op; otherwise, the transfer is only synchronous if the sampler did not return pinned memory.
+        negative_batch = negative_batch.to(self.device, non_blocking=True)
+
         # apply filter mask
         if positive_filter is None:
             negative_score_shape = negative_batch.shape[:2]
             negative_batch = negative_batch.view(-1, 3)
         else:
+            positive_filter = positive_filter.to(self.device, non_blocking=True)
             negative_batch = negative_batch[positive_filter]
             negative_score_shape = negative_batch.shape[:-1]
 
-        # Ensure they reside on the device (should hold already for most simple negative samplers, e.g.
-        # BasicNegativeSampler, BernoulliNegativeSampler
-        negative_batch = negative_batch.to(self.device)
-
         # Compute negative and positive scores
         positive_scores = self.model.score_hrt(positive_batch, mode=self.mode)
         negative_scores = self.model.score_hrt(negative_batch, mode=self.mode).view(*negative_score_shape)
@@ -858,7 +858,7 @@ def unpack_singletons(*xs: Tuple[X]) -> Sequence[Union[X, Tuple[X]]]:
 
 def extend_batch(
     batch: MappedTriples,
-    all_ids: List[int],
+    all_ids: Union[List[int], torch.LongTensor],
     dim: int,
 ) -> MappedTriples:
     """Extend batch for 1-to-all scoring by explicit enumeration.
@@ -873,21 +873,17 @@ def extend_batch(
     :return: shape: (batch_size * num_choices, 3)
         A large batch, where every pair from the original batch is combined with every ID.
     """
-    # Extend the batch to the number of IDs such that each pair can be combined with all possible IDs
-    extended_batch = batch.repeat_interleave(repeats=len(all_ids), dim=0)
-
     # Create a tensor of all IDs
-    ids = torch.tensor(all_ids, dtype=torch.long, device=batch.device)
-
-    # Extend all IDs to the number of pairs such that each ID can be combined with every pair
-    extended_ids = ids.repeat(batch.shape[0])
+    ids = torch.as_tensor(all_ids, dtype=torch.long, device=batch.device)
 
-    # Fuse the extended pairs with all IDs to a new (h, r, t) triple tensor.
-    columns = [extended_batch[:, i] for i in (0, 1)]
-    columns.insert(dim, extended_ids)
-    hrt_batch = torch.stack(columns, dim=-1)
+    # Allocate the result once, and fill it by broadcasting, rather than materializing repeated copies of the
+    # pairs and IDs first, shape: (batch_size, num_choices, 3)
+    hrt_batch = batch.new_empty(batch.shape[0], ids.shape[0], 3)
+    hrt_batch[:, :, dim] = ids.unsqueeze(dim=0)
+    for j, i in enumerate(i for i in range(3) if i != dim):
+        hrt_batch[:, :, i] = batch[:, j, None]
 
-    return hrt_batch
+    return hrt_batch.view(-1, 3)
 
 
 def check_shapes(
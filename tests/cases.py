@@ -1142,6 +1142,29 @@ class ModelTestCase(unittest_templates.GenericTestCase[Model]):
         """Test running the pipeline on almost all models with only training data."""
         self._help_test_cli(["-t", NATIONS_TRAIN_PATH, "-q", NATIONS_TEST_PATH] + self._cli_extras)
 
+    def _help_test_trace_score_hrt(self):
+        """Test that traced scores match the eager ones, also after a parameter update."""
+        hrt_batch = self.factory.mapped_triples[: self.batch_size].to(self.instance.device)
+        optimizer = SGD(params=self.instance.get_grad_params(), lr=1.0)
+        self.instance.trace_score_hrt()
+        previous = None
+        for _ in range(2):
+            self.instance.eval()
+            scores = self.instance.score_hrt(hrt_batch=hrt_batch)
+            assert self.instance._traced_score_hrt
+            expected = self.instance._score_hrt(hrt_batch=hrt_batch)
+            assert torch.allclose(scores, expected, atol=1.0e-06)
+            if previous is not None:
+                assert not torch.allclose(scores, previous)
+            previous = scores.detach().clone()
+            # update the parameters
+            self.instance.train()
+            assert not self.instance._traced_score_hrt
+            optimizer.zero_grad()
+            self.instance.score_hrt(hrt_batch=hrt_batch).sum().backward()
+            optimizer.step()
+            self.instance.post_parameter_update()
+
     def _help_test_cli(self, args):
         """Test running the pipeline on all models."""
         if issubclass(self.cls, pykeen.models.RGCN) or self.cls is pykeen.models.ERModel:
@@ -1421,6 +1444,23 @@ class RepresentationTestCase(GenericTestCase[RepresentationModule]):
         """Test with all indices."""
         self._test_indices(indices=torch.arange(self.instance.max_id))
 
+    def test_forward_unique(self):
+        """Test that de-duplication does not change the result."""
+        self.instance.eval()
+        indices = torch.randint(self.instance.max_id, size=(self.batch_size, self.num_negatives))
+        expected = self.instance(indices=indices)
+        self.instance.unique_threshold = 0
+        assert torch.allclose(self.instance.forward_unique(indices=indices), expected)
+
+    def _help_test_forward_unique_small_batch(self):
+        """Test that forward_unique de-duplicates even small batches, for representations with expensive lookups."""
+        assert self.instance.unique_threshold == 0
+        indices = torch.as_tensor([0, 0, 1, 1, 1], dtype=torch.long)
+        with patch.object(self.instance, "forward", wraps=self.instance.forward) as forward:
+            self.instance.forward_unique(indices=indices)
+        forward.assert_called_once()
+        assert forward.call_args[0][0].tolist() == [0, 1]
+
 
 class EdgeWeightingTestCase(GenericTestCase[pykeen.nn.weighting.EdgeWeighting]):
     """Tests for message weighting."""
@@ -1867,6 +1907,10 @@ class NodePieceTestCase(RepresentationTestCase):
         )
         return kwargs
 
+    def test_forward_unique_small_batch(self):
+        """Test that the token aggregation is only run for unique indices."""
+        self._help_test_forward_unique_small_batch()
+
 
 class EvaluationOnlyModelTestCase(unittest_templates.GenericTestCase[pykeen.models.EvaluationOnlyModel]):
     """Test case for evaluation only models."""
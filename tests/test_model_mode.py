@@ -4,6 +4,7 @@
 
 import unittest
 from dataclasses import dataclass
+from unittest.mock import patch
 
 import torch
 from torch import nn
@@ -192,3 +193,18 @@ class MinimalTriplesFactory:
     entity_ids = list(range(num_entities))
     relation_ids = list(range(num_relations))
     create_inverse_triples: bool = False
+
+
+class NestedSimpleInteractionModel(SimpleInteractionModel):
+    """A subclass of a model with automatic parameter reset, which resets automatically, too."""
+
+
+class TestAutoReset(unittest.TestCase):
+    """Tests for the automatic parameter reset after initialization."""
+
+    def test_reset_once_for_nested_subclass(self):
+        """Test that reset_parameters_ runs exactly once for a subclass of an automatically reset model."""
+        for cls in (SimpleInteractionModel, NestedSimpleInteractionModel):
+            with self.subTest(cls=cls.__name__), patch.object(cls, "reset_parameters_") as reset_parameters_:
+                cls(triples_factory=MinimalTriplesFactory)
+                reset_parameters_.assert_called_once()
@@ -7,6 +7,7 @@ import itertools
 import os
 import unittest
 from typing import Any, Iterable, MutableMapping, Optional, Set, Type, Union
+from unittest.mock import patch
 
 import numpy
 import torch
@@ -26,13 +27,13 @@ from pykeen.models import (
     model_resolver,
 )
 from pykeen.models.multimodal.base import LiteralModel
-from pykeen.models.predict import get_all_prediction_df, get_novelty_mask, predict
+from pykeen.models.predict import _TopKScoreConsumer, get_all_prediction_df, get_novelty_mask, predict
 from pykeen.models.unimodal.node_piece import _ConcatMLP
 from pykeen.nn import Embedding, EmbeddingSpecification, NodePieceRepresentation
 from pykeen.utils import all_in_bounds, extend_batch
 from tests import cases
 from tests.constants import EPSILON
-from tests.test_model_mode import SimpleInteractionModel
+from tests.test_model_mode import NestedSimpleInteractionModel, SimpleInteractionModel
 
 SKIP_MODULES = {
     Model,
@@ -44,6 +45,7 @@ SKIP_MODULES = {
     ERModel,
     FixedModel,
     SimpleInteractionModel,
+    NestedSimpleInteractionModel,
     EvaluationOnlyModel,
 }
 SKIP_MODULES.update(LiteralModel.__subclasses__())
@@ -67,12 +69,53 @@ class TestCompGCN(cases.ModelTestCase):
         )
         return kwargs
 
+    def test_trace_score_hrt(self):
+        """Test that the traced scoring does not use stale enriched representations."""
+        self._help_test_trace_score_hrt()
+
 
 class TestComplex(cases.ModelTestCase):
     """Test the ComplEx model."""
 
     cls = pykeen.models.ComplEx
 
+    def test_to_inference_dtype(self):
+        """Test that converting to a data type without complex counterpart is rejected, and scores are retained."""
+        with self.assertRaises(ValueError):
+            self.instance.to_inference_dtype(dtype=torch.bfloat16)
+        hrt_batch = self.factory.mapped_triples[: self.batch_size].to(self.instance.device)
+        self.instance.eval()
+        expected = self.instance.score_hrt(hrt_batch=hrt_batch)
+        self.instance.to_inference_dtype(dtype=torch.float64)
+        assert torch.allclose(self.instance.score_hrt(hrt_batch=hrt_batch).float(), expected, atol=1.0e-05)
+
+    def _get_regularization_term(self) -> torch.FloatTensor:
+        """Get the summed term of the entity and relation regularizers, and reset them afterwards."""
+        regularizers = [
+            self.instance.entity_representations[0].regularizer,
+            self.instance.relation_representations[0].regularizer,
+        ]
+        term = sum(regularizer.term.detach().clone() for regularizer in regularizers)
+        for regularizer in regularizers:
+            regularizer.reset()
+        return term
+
+    def test_regularization_term(self):
+        """Test that scoring triples regularizes heads and tails separately, as before the joint lookup."""
+        self.instance.train()
+        hrt_batch = self.factory.mapped_triples[: self.batch_size].to(self.instance.device)
+        h, r, t = hrt_batch.t()
+        # expected: separate lookups for heads, relations, and tails
+        for indices, representation in (
+            (h, self.instance.entity_representations[0]),
+            (r, self.instance.relation_representations[0]),
+            (t, self.instance.entity_representations[0]),
+        ):
+            representation.forward_unique(indices=indices)
+        expected = self._get_regularization_term()
+        self.instance.score_hrt(hrt_batch=hrt_batch)
+        assert torch.allclose(self._get_regularization_term(), expected)
+
 
 class TestConvE(cases.ModelTestCase):
     """Test the ConvE model."""
@@ -862,6 +905,61 @@ class ERModelTests(cases.ModelTestCase):
     def test_has_hpo_defaults(self):  # noqa: D102
         raise unittest.SkipTest(f"Base class {self.cls} does not provide HPO defaults.")
 
+    @unittest.skipUnless(hasattr(torch, "compile"), reason="torch.compile requires PyTorch 2.0+")
+    def test_compile_score_hrt(self):
+        """Test that the compiled triple scoring gives the same scores as the eager one."""
+        self.instance.eval()
+        hrt_batch = self.factory.mapped_triples[: self.batch_size].to(self.instance.device)
+        expected = self.instance.score_hrt(hrt_batch=hrt_batch)
+        self.instance.compile_score_hrt()
+        assert self.instance._compiled_score_hrt is not None
+        scores = self.instance.score_hrt(hrt_batch=hrt_batch)
+        assert torch.allclose(scores, expected, atol=1.0e-06)
+
+    def test_to_inference_dtype(self):
+        """Test that scores are retained up to the reduced precision after converting to bfloat16."""
+        hrt_batch = self.factory.mapped_triples[: self.batch_size].to(self.instance.device)
+        self.instance.eval()
+        expected = self.instance.score_hrt(hrt_batch=hrt_batch)
+        self.instance.to_inference_dtype(dtype=torch.bfloat16)
+        scores = self.instance.score_hrt(hrt_batch=hrt_batch)
+        assert scores.dtype == torch.bfloat16
+        assert torch.allclose(scores.float(), expected, rtol=5.0e-02, atol=5.0e-02)
+
+    def test_trace_score_hrt(self):
+        """Test that the traced scoring is consistent with the eager one."""
+        self._help_test_trace_score_hrt()
+
+    def test_late_sub_module_registration(self):
+        """Test that sub-modules registered after initialization are updated and regularized."""
+        # fill the caches
+        self.instance.post_parameter_update()
+        self.instance.collect_regularization_term()
+        self.instance.extra_representation = extra = Embedding(num_embeddings=3, embedding_dim=2, regularizer="lp")
+        with patch.object(extra, "post_parameter_update") as post_parameter_update:
+            self.instance.post_parameter_update()
+        post_parameter_update.assert_called_once()
+        with patch.object(
+            extra.regularizer, "pop_regularization_term", return_value=torch.ones(tuple())
+        ) as pop_regularization_term:
+            self.instance.collect_regularization_term()
+        pop_regularization_term.assert_called_once()
+
+
+class TopKScoreConsumerTests(unittest.TestCase):
+    """Tests for the top-k score consumer."""
+
+    def test_expanded_scores(self):
+        """Test that expanded scores, e.g., for models without entity representations, can be consumed."""
+        batch_size, num_entities, k = 3, 5, 4
+        hr_batch = torch.zeros(batch_size, 2, dtype=torch.long)
+        scores = torch.rand(batch_size, 1).expand(-1, num_entities)
+        consumer = _TopKScoreConsumer(k=k, device=torch.device("cpu"))
+        consumer(head_id_range=(0, batch_size), relation_id=0, hr_batch=hr_batch, scores=scores)
+        top_triples, top_scores = consumer.finalize()
+        assert top_triples.shape == (k, 3)
+        assert top_scores.shape == (k,)
+
 
 class InverseRelationPredictionTests(unittest_templates.GenericTestCase[pykeen.models.FixedModel]):
     """Test for prediction with inverse relations."""
@@ -13,6 +13,7 @@ import unittest_templates
 import pykeen.nn.emb
 import pykeen.nn.message_passing
 import pykeen.nn.node_piece
+import pykeen.nn.weighting
 from pykeen.datasets import get_dataset
 from pykeen.triples.generation import generate_triples_factory
 from tests import cases, mocks
@@ -22,6 +23,11 @@ try:
 except ImportError:
     transformers = None
 
+try:
+    import torch_scatter
+except ImportError:
+    torch_scatter = None
+
 
 class EmbeddingTests(cases.RepresentationTestCase):
     """Tests for embeddings."""
@@ -38,6 +44,25 @@ class EmbeddingTests(cases.RepresentationTestCase):
         embedding_dim = int(numpy.prod(self.instance.shape))
         assert self.instance.shape == (embedding_dim,)
 
+    def test_forward_unique_regularizer(self):
+        """Test that the regularization term does not depend on the de-duplication threshold."""
+        instance = self.cls(num_embeddings=7, embedding_dim=13, regularizer="lp")
+        assert instance.has_regularizer
+        assert not self.cls(num_embeddings=7, embedding_dim=13).has_regularizer
+        instance.train()
+        indices = torch.as_tensor([0, 0, 0, 1, 2, 2], dtype=torch.long)
+        terms = []
+        for unique_threshold in (0, 1024):
+            instance.unique_threshold = unique_threshold
+            instance.forward_unique(indices=indices)
+            terms.append(instance.regularizer.term.detach().clone())
+            instance.regularizer.reset()
+        # the expected value is the term for the unique indices
+        instance(indices.unique())
+        expected = instance.regularizer.term.detach().clone()
+        for term in terms:
+            assert torch.allclose(term, expected)
+
     def test_dropout(self):
         """Test dropout layer."""
         # create a new instance with guaranteed dropout
@@ -124,6 +149,134 @@ class TestSingleCompGCNRepresentationTests(cases.RepresentationTestCase):
         )
         return kwargs
 
+    def test_enriched_representations_cached(self):
+        """Test that the message passing is only computed once per parameter update."""
+        self.instance.train()
+        combined = self.instance.combined
+        combined.post_parameter_update()
+        first = combined()
+        # e.g., scoring positive and negative triples of the same batch re-uses the enriched representations
+        assert combined() is first
+        combined.post_parameter_update()
+        assert combined() is not first
+
+    def test_enriched_representations_load_state_dict(self):
+        """Test that loading a state invalidates the enriched representations, e.g., during evaluation."""
+        self.instance.eval()
+        combined = self.instance.combined
+        with torch.no_grad():
+            first = combined()
+            assert combined() is first
+            combined.load_state_dict(combined.state_dict())
+            assert combined() is not first
+
+    def test_enriched_representations_inference_mode(self):
+        """Test that representations computed in inference mode are not re-used when gradients are required."""
+        self.instance.eval()
+        combined = self.instance.combined
+        combined.post_parameter_update()
+        with torch.no_grad():
+            x_e, _ = combined()
+        assert x_e.is_inference()
+        x_e, _ = combined()
+        assert not x_e.is_inference()
+        assert x_e.requires_grad
+
+    def _make_combined(self, dim: int, **kwargs) -> pykeen.nn.emb.CombinedCompGCNRepresentations:
+        """Create combined CompGCN representations with the given dimension for the base and enriched ones."""
+        return pykeen.nn.emb.CombinedCompGCNRepresentations(
+            triples_factory=generate_triples_factory(
+                num_entities=self.num_entities,
+                num_relations=self.num_relations,
+                num_triples=self.num_triples,
+                create_inverse_triples=True,
+            ),
+            embedding_specification=pykeen.nn.emb.EmbeddingSpecification(embedding_dim=dim),
+            dims=dim,
+            **kwargs,
+        )
+
+    def test_has_regularizer(self):
+        """Test that regularizers of the base representations do not count as regularizers of the enriched ones."""
+        combined = pykeen.nn.emb.CombinedCompGCNRepresentations(
+            triples_factory=generate_triples_factory(
+                num_entities=self.num_entities,
+                num_relations=self.num_relations,
+                num_triples=self.num_triples,
+                create_inverse_triples=True,
+            ),
+            embedding_specification=pykeen.nn.emb.EmbeddingSpecification(embedding_dim=self.dim, regularizer="lp"),
+            dims=self.dim,
+        )
+        assert combined.entity_representations.has_regularizer
+        for representation in combined.split():
+            assert not representation.has_regularizer
+
+    def _help_test_autocast(self, edge_weighting: str):
+        """Test message passing under automatic mixed precision with bfloat16 on CPU."""
+        combined = self._make_combined(
+            dim=4,
+            layer_kwargs=dict(edge_weighting=edge_weighting, attention_heads=2),
+            autocast_dtype=torch.bfloat16,
+        )
+        # the enriched representations are cast back to the data type of the base representations
+        combined.train()
+        x_e, x_r = combined()
+        assert x_e.dtype == torch.float32
+        assert x_r.dtype == torch.float32
+        (x_e.sum() + x_r.sum()).backward()
+        for base in (combined.entity_representations, combined.relation_representations):
+            for parameter in base.parameters():
+                assert parameter.grad is not None
+        # representations computed in inference mode are re-computed when gradients are required
+        combined.eval()
+        with torch.no_grad():
+            x_e, _ = combined()
+        assert x_e.is_inference()
+        assert x_e.dtype == torch.float32
+        x_e, _ = combined()
+        assert not x_e.is_inference()
+        assert x_e.requires_grad
+        assert x_e.dtype == torch.float32
+
+    def test_autocast_symmetric(self):
+        """Test automatic mixed precision with symmetric edge weighting."""
+        self._help_test_autocast(edge_weighting="symmetric")
+
+    @unittest.skipIf(torch_scatter is None, reason="torch_scatter is not installed")
+    def test_autocast_attention(self):
+        """Test automatic mixed precision with attention edge weighting."""
+        self._help_test_autocast(edge_weighting="attention")
+
+    @unittest.skipIf(torch_scatter is None, reason="torch_scatter is not installed")
+    def test_autocast_accumulation(self):
+        """Test that messages are accumulated in single precision under automatic mixed precision."""
+        # note: the attention weighting keeps the reduced precision of the messages
+        combined = self._make_combined(
+            dim=4,
+            layer_kwargs=dict(edge_weighting="attention", attention_heads=2),
+            autocast_dtype=torch.bfloat16,
+        )
+        layer = combined.layers[0]
+        x_e = combined.entity_representations()
+        x_r = combined.relation_representations()
+        with torch.autocast(device_type="cpu", dtype=torch.bfloat16):
+            x = layer.message(
+                x_e=x_e, x_r=x_r, edge_index=combined.edge_index, edge_type=2 * combined.edge_type, weight=layer.w_fwd
+            )
+        assert x.dtype == torch.float32
+
+    @unittest.skipIf(torch_scatter is None, reason="torch_scatter is not installed")
+    def test_attention_edge_weighting(self):
+        """Test that the layers pass matching keyword arguments to the attention edge weighting."""
+        # the attention's message dimension has to be divisible by the number of heads
+        combined = self._make_combined(dim=4, layer_kwargs=dict(edge_weighting="attention", attention_heads=2))
+        for layer in combined.layers:
+            assert isinstance(layer.edge_weighting, pykeen.nn.weighting.AttentionEdgeWeighting)
+        x_e, x_r = combined()
+        assert x_e.shape == (combined.entity_representations.max_id, 4)
+        assert x_r.shape == (combined.relation_representations.max_id, 4)
+
 
 class NodePieceRelationTests(cases.NodePieceTestCase):
     """Tests for node piece representation."""
@@ -216,6 +369,10 @@ class LabelBasedTransformerRepresentationTests(cases.RepresentationTestCase):
         kwargs["labels"] = sorted(get_dataset(dataset="nations").entity_to_id.keys())
         return kwargs
 
+    def test_forward_unique_small_batch(self):
+        """Test that the transformer only encodes the labels of unique indices."""
+        self._help_test_forward_unique_small_batch()
+
 
 class RepresentationModuleMetaTestCase(unittest_templates.MetaTestCase[pykeen.nn.emb.RepresentationModule]):
     """Test that there are tests for all representation modules."""
@@ -127,6 +127,13 @@ class DistMultTests(cases.InteractionTestCase):
     def _exp_score(self, h, r, t) -> torch.FloatTensor:
         return (h * r * t).sum(dim=-1)
 
+    def test_score_t_matmul(self):
+        """Test that the matrix multiplication-based 1:n scoring is consistent with the broadcasted one."""
+        h, r, t = self._get_hrt((self.batch_size,), (self.batch_size,), (self.num_entities,))
+        scores = self.instance.score_t(h=h, r=r, all_entities=t)
+        exp_scores = self.instance(h=h.unsqueeze(dim=1), r=r.unsqueeze(dim=1), t=t.unsqueeze(dim=0))
+        assert torch.allclose(scores, exp_scores)
+
 
 class DistMATests(cases.InteractionTestCase):
     """Tests for DistMA interaction function."""
@@ -1,7 +1,7 @@
 """Tests for node piece."""
 import numpy
 import numpy.testing
-import scipy.sparse.csgraph
+import scipy.sparse
 import unittest_templates
 
 import pykeen.nn.node_piece
@@ -50,13 +50,24 @@ class ScipySparseAnchorSearcherTests(cases.AnchorSearcherTestCase):
 
     cls = pykeen.nn.node_piece.ScipySparseAnchorSearcher
 
+    #: the adjacency matrix of a chain graph
+    adjacency: scipy.sparse.csr_matrix
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """Create the (read-only) adjacency matrix once for all tests."""
+        super().setUpClass()
+        edge_index = numpy.stack([numpy.arange(cls.num_entities - 1), numpy.arange(1, cls.num_entities)])
+        cls.adjacency = pykeen.nn.node_piece.ScipySparseAnchorSearcher.create_adjacency(edge_index=edge_index)
+        # ensure canonical format, i.e., sorted indices without duplicates
+        cls.adjacency.sum_duplicates()
+
     def test_bfs(self):
         """Test bfs."""
         self.instance: pykeen.nn.node_piece.ScipySparseAnchorSearcher
         k = 2
         max_iter = 3
-        edge_index = numpy.stack([numpy.arange(self.num_entities - 1), numpy.arange(1, self.num_entities)])
-        adjacency = self.instance.create_adjacency(edge_index=edge_index)
+        adjacency = self.adjacency
         anchors = numpy.arange(3)
         # determine pool using anchor searcher
         pool = self.instance.bfs(
@@ -65,16 +76,20 @@ class ScipySparseAnchorSearcherTests(cases.AnchorSearcherTestCase):
             max_iter=max_iter,
             k=k,
         )
-        # determine expected pool using shortest path distances via scipy.sparse.csgraph
-        distances = scipy.sparse.csgraph.shortest_path(
-            csgraph=adjacency,
-            directed=False,
-            return_predecessors=False,
-            unweighted=True,
-            indices=anchors,
-        )
-        k_dist = numpy.partition(distances, kth=k, axis=0)[:k, :].T.max(axis=1)
-        exp_pool = ((distances <= k_dist) & (k_dist <= max_iter)).T
+        # determine expected pool using hop distances from a multi-source BFS, truncated after max_iter hops
+        # note: larger distances are irrelevant for the pool, and are thus represented by a sentinel value
+        unreached = numpy.iinfo(numpy.uint8).max
+        assert max_iter < unreached
+        # shape: (num_entities, num_anchors)
+        distances = numpy.full(shape=(self.num_entities, len(anchors)), fill_value=unreached, dtype=numpy.uint8)
+        distances[anchors, numpy.arange(len(anchors))] = 0
+        for hop in range(max_iter):
+            # the adjacency matrix is symmetric (and contains self-loops)
+            reached = adjacency.dot(distances == hop)
+            distances[reached & (distances == unreached)] = hop + 1
+        # the k-th smallest distance for each entity
+        k_dist = numpy.partition(distances, kth=k - 1, axis=1)[:, k - 1]
+        exp_pool = (distances <= k_dist[:, None]) & (k_dist <= max_iter)[:, None]
 
         numpy.testing.assert_array_equal(pool, exp_pool)
 